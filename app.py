@@ -1,8 +1,6 @@
 import streamlit as st
-import numpy as np
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
 import pandas as pd
+from distribution import INCOME_RANGE, CDF, DENSITY_CURVE30, SIGMA, SCALE, cdf_at, lognorm_cdf, regions_frame
 
 st.set_page_config(page_title="Canada Home Affordability", layout="wide")
 
@@ -18,34 +16,7 @@ REGIONS = {
     "National": {"down_payment": 0.05, "rate": 0.045, "first_time": 0.05, "pop": 20_000_000, "incentive": 0.95}
 }
 
-# Log-normal functions
-mu, sigma = 10.45, 0.95
-scale = np.exp(mu)
-income_range = np.linspace(1, 300_000, 1000)
-
-def lognorm_pdf(x, s, scale):
-    return (1 / (x * s * np.sqrt(2 * np.pi))) * np.exp(-((np.log(x) - np.log(scale))**2) / (2 * s**2))
-
-def lognorm_cdf(x, s, scale):
-    z = (np.log(x) - np.log(scale)) / s
-    return 0.5 * (1 + np.tanh(np.sqrt(2) * z / 2) + np.sqrt(2/np.pi) * np.exp(-z**2/2))
-
-pdf = lognorm_pdf(income_range, sigma, scale)
-cdf = lognorm_cdf(income_range, sigma, scale)
-
-# Mortgage calculator
-def calculate_max_affordable(price, down_payment_pct, mortgage_rate, amortization=25):
-    down_payment = price * down_payment_pct
-    loan = price - down_payment
-    monthly_rate = mortgage_rate / 12
-    n_payments = amortization * 12
-    
-    # Monthly payment formula
-    monthly_payment = loan * (monthly_rate * (1 + monthly_rate)**n_payments) / ((1 + monthly_rate)**n_payments - 1)
-    
-    # Annual income needed (28% housing ratio)
-    annual_income_needed = monthly_payment * 12 / 0.28
-    return annual_income_needed
+REGIONS_DF = regions_frame(REGIONS)
 
 # Tabs
 tab1, tab2 = st.tabs(["🏠 Home Affordability", "📊 Income Distribution"])
@@ -54,10 +25,13 @@ with tab1:
     col1, col2 = st.columns(2)
     
     with col1:
-        st.header("Home Details")
-        home_price = st.number_input("Purchase Price ($)", 100000, 2000000, 800000, 50000)
-        region = st.selectbox("Region", list(REGIONS.keys()))
-        first_time_buyer = st.checkbox("First Time Buyer")
+        # A form batches edits: the script only reruns when Calculate is pressed
+        with st.form("home_details"):
+            st.header("Home Details")
+            home_price = st.number_input("Purchase Price ($)", 100000, 2000000, 800000, 50000)
+            region = st.selectbox("Region", list(REGIONS.keys()))
+            first_time_buyer = st.checkbox("First Time Buyer")
+            st.form_submit_button("Calculate")
         
         region_data = REGIONS[region]
         down_payment_pct = region_data["first_time"] if first_time_buyer else region_data["down_payment"]
@@ -68,10 +42,11 @@ with tab1:
     
     with col2:
         st.header("Results")
-        max_income_needed = calculate_max_affordable(home_price, down_payment_pct, mortgage_rate)
+        income_factor = REGIONS_DF.at[region, "k_first_time" if first_time_buyer else "k_down_payment"]
+        max_income_needed = home_price * income_factor
         
         # People who can afford
-        prob_affordable = 1 - lognorm_cdf(max_income_needed, sigma, scale)
+        prob_affordable = 1 - cdf_at(max_income_needed, SIGMA, SCALE)
         people_affordable = prob_affordable * total_pop
         percent_affordable = prob_affordable * 100
         
@@ -85,50 +60,95 @@ with tab1:
         
         st.caption(f"**Assumptions**: 28% housing ratio, {25}yr amortization, stress test passed")
 
-with tab2:
-    # Original income distribution with affordability line
-    st.sidebar.header("Income Range")
-    min_income = st.sidebar.slider("Min ($)", 0, 150000, 25000, 5000)
-    max_income = st.sidebar.slider("Max ($)", min_income, 300000, 100000, 5000)
+# Fragment: moving these sliders reruns only this function, not the whole script
+@st.fragment
+def income_range_filter(total_pop):
+    st.header("Income Range")
+    min_income = st.slider("Min ($)", 0, 150000, 25000, 5000)
+    max_income = st.slider("Max ($)", min_income, 300000, 100000, 5000)
     
-    prob = lognorm_cdf(max_income, sigma, scale) - lognorm_cdf(min_income, sigma, scale)
+    prob = cdf_at(max_income, SIGMA, SCALE) - cdf_at(min_income, SIGMA, SCALE)
     st.metric(f"People in ${min_income:,}-${max_income:,} range", f"{prob*total_pop:,.0f} ({prob*100:.1f}%)")
+
+# Separate figures per panel so interacting with one never relayouts the other
+def build_pdf_fig(threshold, home_price, x_plot, density_plot):
+    # Plotly is imported on first chart render to keep it off the cold-start path
+    import plotly.graph_objects as go
     
-    # Chart with affordability threshold
-    fig = make_subplots(rows=1, cols=2, subplot_titles=('📈 Income Distribution', '📊 Cumulative'))
-    
-    density_scaled = pdf / np.max(pdf) * 30
-    fig.add_trace(go.Scatter(x=income_range, y=density_scaled, mode='lines',
-                            line=dict(color='#1f77b4', width=4)), row=1, col=1)
+    fig = go.Figure()
+    fig.add_trace(go.Scattergl(x=x_plot, y=density_plot, mode='lines',
+                            line=dict(color='#1f77b4', width=4)))
     
     # Affordability threshold line
-    fig.add_vline(x=max_income_needed if 'max_income_needed' in locals() else 80000, 
-                  line_dash="dash", line_color="orange", 
-                  annotation_text=f"Afford ${home_price:,}", row=1, col=1)
+    fig.add_vline(x=threshold, line_dash="dash", line_color="orange", 
+                  annotation_text=f"Afford ${home_price:,}", annotation_name="Threshold",
+                  name="Threshold")
+    
+    fig.update_layout(title='📈 Income Distribution', height=500, showlegend=False)
+    fig.update_xaxes(title="Income ($)", tickformat="$,d", range=[0, 300_000])
+    return fig
+
+def build_cdf_fig(x_cdf, cdf):
+    import plotly.graph_objects as go
     
-    fig.add_trace(go.Scatter(x=income_range, y=cdf*100, mode='lines',
-                            line=dict(color='#2ca02c', width=3)), row=1, col=2)
+    fig = go.Figure()
+    fig.add_trace(go.Scattergl(x=x_cdf, y=cdf*100, mode='lines',
+                            line=dict(color='#2ca02c', width=3)))
     
-    fig.update_layout(height=500, showlegend=False)
-    fig.update_xaxes(title="Income ($)", tickformat="$,d")
+    fig.update_layout(title='📊 Cumulative', height=500, showlegend=False)
+    fig.update_xaxes(title="Income ($)", tickformat="$,d", range=[0, 300_000])
+    return fig
+
+def income_pdf_chart(threshold, home_price):
+    # Build the figure once per session, then only move the threshold line
+    if "income_pdf_fig" not in st.session_state:
+        x_plot, density_plot = DENSITY_CURVE30
+        st.session_state.income_pdf_fig = build_pdf_fig(threshold, home_price, x_plot, density_plot)
+    fig = st.session_state.income_pdf_fig
+    fig.update_shapes(x0=threshold, x1=threshold, selector=dict(name="Threshold"))
+    fig.update_annotations(x=threshold, text=f"Afford ${home_price:,}", selector=dict(name="Threshold"))
     st.plotly_chart(fig, use_container_width=True)
 
-# Regional comparison table
-st.subheader("🏛️ Regional Comparison")
-if st.button("Compare Regions"):
-    comparison_data = []
-    for region, data in REGIONS.items():
-        income_needed = calculate_max_affordable(home_price, data["first_time"], data["rate"])
-        prob = 1 - lognorm_cdf(income_needed, sigma, scale)
-        comparison_data.append({
-            "Region": region,
-            "Min Income Needed": f"${income_needed:,.0f}",
-            "Can Afford": f"{prob*data['pop']:,.0f}",
-            "% Population": f"{prob*100:.1f}%"
+def income_cdf_chart():
+    # Nothing on the CDF panel depends on user input
+    if "income_cdf_fig" not in st.session_state:
+        st.session_state.income_cdf_fig = build_cdf_fig(INCOME_RANGE, CDF)
+    st.plotly_chart(st.session_state.income_cdf_fig, use_container_width=True)
+
+# Fragment: clicking Compare Regions reruns only the comparison table
+@st.fragment
+def region_comparison(home_price):
+    if st.button("Compare Regions"):
+        # All regions at once from the precomputed per-dollar factors
+        incomes_needed = home_price * REGIONS_DF["k_first_time"]
+        probs = 1 - lognorm_cdf(incomes_needed, SIGMA, SCALE)
+        
+        # Raw numeric columns; the frontend formats them on render
+        df = pd.DataFrame({
+            "Min Income Needed ($)": incomes_needed.round(),
+            "Can Afford": (probs * REGIONS_DF["pop"]).round(),
+            "% Population": probs * 100
+        }).rename_axis("Region").reset_index()
+        st.dataframe(df, use_container_width=True, column_config={
+            "Min Income Needed ($)": st.column_config.NumberColumn(format="localized"),
+            "Can Afford": st.column_config.NumberColumn(format="localized"),
+            "% Population": st.column_config.NumberColumn(format="%.1f%%")
         })
+
+with tab2:
+    # Original income distribution with affordability line
+    with st.sidebar:
+        income_range_filter(total_pop)
     
-    df = pd.DataFrame(comparison_data)
-    st.dataframe(df, use_container_width=True)
+    chart_col1, chart_col2 = st.columns(2)
+    with chart_col1:
+        income_pdf_chart(max_income_needed, home_price)
+    with chart_col2:
+        income_cdf_chart()
+
+# Regional comparison table
+st.subheader("🏛️ Regional Comparison")
+region_comparison(home_price)
 
 # Key assumptions
 with st.expander("ℹ️ Assumptions & Regulations"):
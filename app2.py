@@ -1,8 +1,6 @@
 import streamlit as st
-import numpy as np
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
 import pandas as pd
+from distribution import DENSITY_CURVE40, SIGMA, SCALE, cdf_at, lognorm_cdf, regions_frame
 
 st.set_page_config(page_title="Canada Home Affordability", layout="wide", page_icon="🏠")
 
@@ -21,48 +19,28 @@ REGIONS = {
     "🇲🇦 Manitoba": {"down_payment": 0.05, "rate": 0.042, "first_time": 0.05, "pop": 1_400_000, "incentive": 1.00}
 }
 
-# Income distribution (Canadian log-normal)
-mu, sigma = 10.45, 0.95
-scale = np.exp(mu)
-income_range = np.linspace(1, 400_000, 1000)
-
-def lognorm_pdf(x, s, scale):
-    return (1 / (x * s * np.sqrt(2 * np.pi))) * np.exp(-((np.log(x) - np.log(scale))**2) / (2 * s**2))
-
-def lognorm_cdf(x, s, scale):
-    z = (np.log(x) - np.log(scale)) / s
-    return 0.5 * (1 + np.tanh(np.sqrt(2) * z / 2) + np.sqrt(2/np.pi) * np.exp(-z**2/2))
-
-pdf = lognorm_pdf(income_range, sigma, scale)
-cdf = lognorm_cdf(income_range, sigma, scale)
-
-# Mortgage calculator
-@st.cache_data
-def calculate_max_affordable(price, down_payment_pct, mortgage_rate, amortization=25):
-    down_payment = price * down_payment_pct
-    loan = price - down_payment
-    monthly_rate = mortgage_rate / 12
-    n_payments = amortization * 12
-    monthly_payment = loan * (monthly_rate * (1 + monthly_rate)**n_payments) / ((1 + monthly_rate)**n_payments - 1)
-    annual_income_needed = monthly_payment * 12 / 0.28  # 28% TDS ratio
-    return annual_income_needed, down_payment
+REGIONS_DF = regions_frame(REGIONS)
 
 # Main calculator
 col1, col2 = st.columns([1, 2])
 
 with col1:
-    st.header("🏠 Home Details")
-    home_price = st.number_input("**Purchase Price**", 100000, 3000000, 800000, 25000)
-    region = st.selectbox("**Region**", list(REGIONS.keys()))
-    first_time_buyer = st.checkbox("**First Time Buyer**", True)
+    # A form batches edits: the script only reruns when Calculate is pressed
+    with st.form("home_details"):
+        st.header("🏠 Home Details")
+        home_price = st.number_input("**Purchase Price**", 100000, 3000000, 800000, 25000)
+        region = st.selectbox("**Region**", list(REGIONS.keys()))
+        first_time_buyer = st.checkbox("**First Time Buyer**", True)
+        st.form_submit_button("**Calculate**", use_container_width=True)
     
     region_data = REGIONS[region]
     down_payment_pct = region_data["first_time"] if first_time_buyer else region_data["down_payment"]
     mortgage_rate = region_data["rate"]
     total_pop = region_data["pop"]
     
-    max_income, down_payment = calculate_max_affordable(home_price, down_payment_pct, mortgage_rate)
-    prob_affordable = 1 - lognorm_cdf(max_income, sigma, scale)
+    income_factor = REGIONS_DF.at[region, "k_first_time" if first_time_buyer else "k_down_payment"]
+    max_income, down_payment = home_price * income_factor, home_price * down_payment_pct
+    prob_affordable = 1 - cdf_at(max_income, SIGMA, SCALE)
     people_affordable = prob_affordable * total_pop
     percent_affordable = prob_affordable * 100
 
@@ -77,35 +55,58 @@ with col2:
     st.metric("**Down Payment Required**", f"${down_payment:,.0f}")
     st.caption(f"*{region}: {down_payment_pct*100:.0f}% down, {mortgage_rate*100:.1f}% rate")
 
-# Regional comparison
-st.subheader("📊 All Regions Comparison")
-if st.button("🔄 Update Comparison", use_container_width=True):
-    comparison = []
-    for region_name, data in REGIONS.items():
-        income_needed, _ = calculate_max_affordable(home_price, data["first_time"], data["rate"])
-        prob = 1 - lognorm_cdf(income_needed, sigma, scale)
-        comparison.append({
-            "Region": region_name,
-            "Min Income": f"${income_needed:,.0f}",
-            "Can Afford": f"{prob*data['pop']:,.0f}",
-            "% of Pop": f"{prob*100:.1f}%"
+# Fragment: clicking Update Comparison reruns only the comparison table
+@st.fragment
+def region_comparison(home_price):
+    if st.button("🔄 Update Comparison", use_container_width=True):
+        # All regions at once from the precomputed per-dollar factors
+        incomes_needed = home_price * REGIONS_DF["k_first_time"]
+        probs = 1 - lognorm_cdf(incomes_needed, SIGMA, SCALE)
+        
+        # Raw numeric columns; the frontend formats them on render
+        df = pd.DataFrame({
+            "Min Income ($)": incomes_needed.round(),
+            "Can Afford": (probs * REGIONS_DF["pop"]).round(),
+            "% of Pop": probs * 100
+        }).rename_axis("Region").reset_index()
+        st.dataframe(df, use_container_width=True, hide_index=True, column_config={
+            "Min Income ($)": st.column_config.NumberColumn(format="localized"),
+            "Can Afford": st.column_config.NumberColumn(format="localized"),
+            "% of Pop": st.column_config.NumberColumn(format="%.1f%%")
         })
+
+def build_income_fig(max_income, x_plot, density_plot):
+    # Plotly is imported on first chart render to keep it off the cold-start path
+    import plotly.graph_objects as go
     
-    df = pd.DataFrame(comparison)
-    st.dataframe(df, use_container_width=True, hide_index=True)
+    fig = go.Figure()
+    fig.add_trace(go.Scattergl(x=x_plot, y=density_plot, mode='lines',
+                            line=dict(color='#1f77b4', width=4), name='Population'))
+    fig.add_vline(x=max_income, line_dash="dash", line_color="red", 
+                  annotation_text=f"Need ${max_income:,.0f}+", annotation_name="Threshold",
+                  name="Threshold")
+    fig.update_layout(height=500, hovermode='x unified', showlegend=True)
+    fig.update_xaxes(title="Annual Income ($)", tickformat="$,d")
+    fig.update_yaxes(title="Population Density")
+    return fig
+
+def income_chart(max_income):
+    # Build the figure once per session, then only move the threshold line
+    if "income_fig" not in st.session_state:
+        x_plot, density_plot = DENSITY_CURVE40
+        st.session_state.income_fig = build_income_fig(max_income, x_plot, density_plot)
+    fig = st.session_state.income_fig
+    fig.update_shapes(x0=max_income, x1=max_income, selector=dict(name="Threshold"))
+    fig.update_annotations(x=max_income, text=f"Need ${max_income:,.0f}+", selector=dict(name="Threshold"))
+    st.plotly_chart(fig, use_container_width=True)
+
+# Regional comparison
+st.subheader("📊 All Regions Comparison")
+region_comparison(home_price)
 
 # Chart
 st.subheader("📈 Income Distribution")
-fig = go.Figure()
-density_scaled = pdf / np.max(pdf) * 40
-fig.add_trace(go.Scatter(x=income_range, y=density_scaled, mode='lines',
-                        line=dict(color='#1f77b4', width=4), name='Population'))
-fig.add_vline(x=max_income, line_dash="dash", line_color="red", 
-              annotation_text=f"Need ${max_income:,.0f}+", name="Threshold")
-fig.update_layout(height=500, hovermode='x unified', showlegend=True)
-fig.update_xaxes(title="Annual Income ($)", tickformat="$,d")
-fig.update_yaxes(title="Population Density")
-st.plotly_chart(fig, use_container_width=True)
+income_chart(max_income)
 
 st.markdown("---")
 with st.expander("ℹ️ **Assumptions**"):
@@ -0,0 +1,97 @@
+import math
+from functools import lru_cache
+import numpy as np
+import pandas as pd
+from scipy.special import erfc
+
+# Income distribution (Canadian log-normal) and mortgage math shared by app.py
+# and app2.py. Streamlit re-executes the app scripts on every rerun, but imported
+# modules are cached, so the grid below is computed once per process.
+MU, SIGMA = 10.45, 0.95
+SCALE = np.exp(MU)
+
+def lognorm_pdf(x, s, scale):
+    # Scalar factors up front so the array work is a single fused expression
+    log_scale = math.log(scale)
+    norm = 1.0 / (s * math.sqrt(2 * math.pi))
+    return np.exp(-0.5 * ((np.log(x) - log_scale) / s)**2) * (norm / x)
+
+def lognorm_cdf(x, s, scale):
+    # Python-float constants so float32 input stays float32
+    z = (np.log(x) - math.log(scale)) / s
+    return 0.5 * erfc(-z / math.sqrt(2))
+
+# Log-spaced grid: the density is heavily right-skewed, so geometric spacing
+# puts the points around the mode instead of along the near-zero upper tail
+def income_grid(mu, sigma, xmax, n=400, xmin=100, dtype=np.float32):
+    # float32 is plenty for plotting and halves the bytes Plotly ships per value
+    scale = np.exp(mu)
+    x = np.geomspace(xmin, xmax, n, dtype=dtype)
+    return x, lognorm_pdf(x, sigma, scale), lognorm_cdf(x, sigma, scale)
+
+INCOME_RANGE, PDF, CDF = income_grid(MU, SIGMA, 400_000)
+
+# Density rescaled to the chart heights used by app.py (30) and app2.py (40)
+DENSITY_SCALED30 = PDF / PDF.max() * 30
+DENSITY_SCALED40 = PDF / PDF.max() * 40
+
+# Largest-Triangle-Three-Buckets: keep the points that preserve the curve's shape
+def lttb_downsample(x, y, n_out=200):
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return x, y
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    idx = np.empty(n_out, dtype=int)
+    idx[0], idx[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        next_lo, next_hi = (edges[i + 1], edges[i + 2]) if i < n_out - 3 else (n - 1, n)
+        avg_x, avg_y = x[next_lo:next_hi].mean(), y[next_lo:next_hi].mean()
+        area = np.abs((x[a] - avg_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y - y[a]))
+        a = lo + int(np.argmax(area))
+        idx[i + 1] = a
+    return x[idx], y[idx]
+
+# Downsampled (x, y) curves actually sent to Plotly, computed once per process
+DENSITY_CURVE30 = lttb_downsample(INCOME_RANGE, DENSITY_SCALED30)
+DENSITY_CURVE40 = lttb_downsample(INCOME_RANGE, DENSITY_SCALED40)
+
+# Scalar twin of lognorm_cdf: plain math calls skip NumPy's ufunc dispatch
+def _lognorm_cdf_scalar(x, s, scale):
+    if x <= 0:
+        return 0.0
+    z = (math.log(x) - math.log(scale)) / s
+    return 0.5 * math.erfc(-z / math.sqrt(2))
+
+# Scalar CDF lookups memoized on whole cents
+@lru_cache(maxsize=1024)
+def _cdf_cents(x_cents, s, scale):
+    return _lognorm_cdf_scalar(x_cents / 100.0, s, scale)
+
+def cdf_at(income, s, scale):
+    return _cdf_cents(round(income * 100), s, scale)
+
+# Mortgage calculator
+def calculate_max_affordable(price, down_payment_pct, mortgage_rate, amortization=25):
+    down_payment = price * down_payment_pct
+    loan = price - down_payment
+    monthly_rate = mortgage_rate / 12
+    n_payments = amortization * 12
+    
+    # Monthly payment formula
+    growth = (1 + monthly_rate)**n_payments
+    monthly_payment = loan * monthly_rate * growth / (growth - 1)
+    
+    # Annual income needed (28% housing ratio)
+    annual_income_needed = monthly_payment * 12 / 0.28
+    return annual_income_needed
+
+# Column-wise copy of a REGIONS dict for vectorized per-region math. Income needed
+# is linear in price, so the per-dollar factors k_* reduce each lookup to price * k
+def regions_frame(regions):
+    df = pd.DataFrame.from_dict(regions, orient="index", dtype=float)
+    rates = df["rate"].to_numpy()
+    df["k_down_payment"] = calculate_max_affordable(1, df["down_payment"].to_numpy(), rates)
+    df["k_first_time"] = calculate_max_affordable(1, df["first_time"].to_numpy(), rates)
+    return df
@@ -0,0 +1,30 @@
+import numpy as np
+import pytest
+from scipy.stats import lognorm
+
+from distribution import SCALE, SIGMA, cdf_at, lognorm_cdf
+
+INCOMES = np.linspace(1, 400_000, 1000)
+
+
+def test_lognorm_cdf_matches_scipy_survival_function():
+    survival = 1 - lognorm_cdf(INCOMES, SIGMA, SCALE)
+    np.testing.assert_allclose(survival, lognorm.sf(INCOMES, s=SIGMA, scale=SCALE), rtol=0, atol=1e-12)
+
+
+def test_lognorm_cdf_keeps_float32_input():
+    cdf = lognorm_cdf(INCOMES.astype(np.float32), SIGMA, SCALE)
+    assert cdf.dtype == np.float32
+    np.testing.assert_allclose(cdf, lognorm.cdf(INCOMES, s=SIGMA, scale=SCALE), rtol=0, atol=1e-5)
+
+
+@pytest.mark.parametrize("income", [1, 25_000, 100_000, 181_043.27, 400_000])
+def test_cdf_at_matches_scipy(income):
+    # cdf_at rounds to whole cents before evaluating
+    expected = lognorm.cdf(round(income * 100) / 100, s=SIGMA, scale=SCALE)
+    assert cdf_at(income, SIGMA, SCALE) == pytest.approx(expected, rel=0, abs=1e-12)
+
+
+@pytest.mark.parametrize("income", [0, -5_000])
+def test_cdf_at_non_positive_income_is_zero(income):
+    assert cdf_at(income, SIGMA, SCALE) == 0.0